@@ -3,7 +3,7 @@ from pathlib import Path
 import torch as T
 from torch.utils.data import Dataset, TensorDataset
 
-from utils import gaussian
+from utils import gaussian_batch
 from utils.architecture import KAN_ARCHITECTURE, MLP_ARCHITECTURE
 from utils.data_management import ExperimentDataType
 from utils.experiment import run_experiment
@@ -24,8 +24,10 @@ PARAMETER_COUNTS = [25, 100, 1_000]
 def create_dataset(device: T.device) -> tuple[T.Tensor, T.Tensor]:
     X = T.linspace(0, NUM_PEAKS, NUM_POINTS, device=device).unsqueeze(1)
     Y = T.linspace(0, LINEAR_SLOPE * NUM_PEAKS, NUM_POINTS, device=device).unsqueeze(1)
-    for i in range(NUM_PEAKS):
-        Y += gaussian(X, i + 0.5, GAUSSIAN_STD)
+
+    # evaluate every peak at once as a (NUM_POINTS, 1, NUM_PEAKS) tensor
+    centers = T.arange(NUM_PEAKS, device=device, dtype=X.dtype) + 0.5
+    Y += gaussian_batch(X, centers, GAUSSIAN_STD).sum(dim=-1)
 
     return X, Y
 
@@ -38,9 +40,10 @@ def main() -> None:
     Y_partitioned = list(T.chunk(Y, NUM_PEAKS))
 
     function_dataset = TensorDataset(X, Y)
-    partitioned_datasets: list[Dataset] = []
-    for X_batch, Y_batch in zip(X_partitioned, Y_partitioned):
-        partitioned_datasets.append(TensorDataset(X_batch, Y_batch))
+    partitioned_datasets: list[Dataset] = [
+        TensorDataset(X_batch, Y_batch)
+        for X_batch, Y_batch in zip(X_partitioned, Y_partitioned)
+    ]
 
     run_experiment(
         EXPERIMENT_NAME,
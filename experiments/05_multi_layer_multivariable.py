@@ -3,7 +3,7 @@ from pathlib import Path
 import torch as T
 from torch.utils.data import Dataset, TensorDataset
 
-from utils import gaussian, partition_2d_graph
+from utils import gaussian_batch, partition_2d_graph
 from utils.architecture import KAN_ARCHITECTURE, MLP_ARCHITECTURE
 from utils.data_management import ExperimentDataType
 from utils.experiment import run_experiment
@@ -25,13 +25,13 @@ PARAMETER_COUNTS = [100, 1_000, 10_000]
 def create_dataset(device: T.device) -> tuple[T.Tensor, T.Tensor]:
     axis = T.linspace(0, NUM_PEAKS, NUM_POINTS, device=device)
     X = T.cartesian_prod(axis, axis)
-    Y = T.zeros((NUM_POINTS**2, 1), device=device)
-    for i in range(NUM_PEAKS):
-        for j in range(NUM_PEAKS):
-            Y += T.cartesian_prod(
-                gaussian(axis, i + 0.5, GAUSSIAN_STD_1),
-                gaussian(axis, j + 0.5, GAUSSIAN_STD_2),
-            ).sum(dim=-1, keepdim=True)
+
+    # summing every pair of peaks over the grid decomposes into
+    # NUM_PEAKS * (sum of x peaks + sum of y peaks) as an outer sum
+    centers = T.arange(NUM_PEAKS, device=device, dtype=axis.dtype) + 0.5
+    sx = gaussian_batch(axis, centers, GAUSSIAN_STD_1).sum(dim=-1)
+    sy = gaussian_batch(axis, centers, GAUSSIAN_STD_2).sum(dim=-1)
+    Y = NUM_PEAKS * (sx.unsqueeze(1) + sy.unsqueeze(0)).reshape(-1, 1)
 
     return X, Y
 
@@ -45,9 +45,10 @@ def main() -> None:
     Y_partitioned = list(partition_2d_graph(Y, NUM_PEAKS))
 
     function_dataset = TensorDataset(X, Y)
-    partitioned_datasets: list[Dataset] = []
-    for X_batch, Y_batch in zip(X_partitioned, Y_partitioned):
-        partitioned_datasets.append(TensorDataset(X_batch, Y_batch))
+    partitioned_datasets: list[Dataset] = [
+        TensorDataset(X_batch, Y_batch)
+        for X_batch, Y_batch in zip(X_partitioned, Y_partitioned)
+    ]
 
     run_experiment(
         EXPERIMENT_NAME,
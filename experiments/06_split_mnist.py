@@ -103,6 +103,7 @@ def main() -> None:
             lr=LR,
             eval_batch_size=EVAL_BATCH_SIZE,
             loss_fn=nn.CrossEntropyLoss(),
+            allow_tf32=True,
             eval_fns={"loss": nn.CrossEntropyLoss(), "acc": calculate_accuracy},
         ),
     )
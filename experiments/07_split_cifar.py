@@ -119,6 +119,7 @@ def main() -> None:
             lr=LR,
             eval_batch_size=EVAL_BATCH_SIZE,
             loss_fn=nn.CrossEntropyLoss(),
+            allow_tf32=True,
             eval_fns={"loss": nn.CrossEntropyLoss(), "acc": calculate_accuracy},
         ),
     )
@@ -36,28 +36,11 @@ def plotly_colors() -> Generator[str, None, None]:
     )
 
 
-def plot_loss_graphs(experiment_reader: ExperimentReader) -> None:
+def plot_loss_graphs(graphs: dict[str, dict[str, T.Tensor]]) -> None:
     """
-    Plots the loss graphs of an experiment
+    Plots the loss graphs of an experiment from a dict of metric -> a dict of model -> values
     """
 
-    # maps a metric -> a dict of model -> values
-    graphs: dict[str, dict[str, T.Tensor]] = {}
-
-    for k, v in experiment_reader.data.items():
-        # only process result items that are losses
-        if not k.endswith("loss"):
-            continue
-
-        # grab the model and metric from the result key
-        model, metric, _ = k.rsplit("_", 2)
-
-        if metric not in graphs:
-            graphs[metric] = {}
-
-        assert isinstance(v, T.Tensor)
-        graphs[metric][model] = v
-
     # Generate a graph for each metric
     # where each trace is a different model
     for metric, metric_data in graphs.items():
@@ -65,7 +48,7 @@ def plot_loss_graphs(experiment_reader: ExperimentReader) -> None:
 
         for (model, values), color in zip(metric_data.items(), plotly_colors()):
             trace = go.Scatter(
-                y=values,
+                y=values.numpy(),
                 name=f"{model.capitalize()} {metric} loss",
                 showlegend=True,
                 line={"color": color},
@@ -79,25 +62,14 @@ def plot_loss_graphs(experiment_reader: ExperimentReader) -> None:
         st.plotly_chart(plot)
 
 
-def plot_1d_prediction_graph(experiment_reader: ExperimentReader) -> None:
+def plot_1d_prediction_graph(
+    predictions: dict[str, dict[str, list[T.Tensor] | T.Tensor]]
+) -> None:
     """
     Creates prediction graphs for 1d functions, i.e., curves
+    from a dict of model -> a dict of task -> values
     """
 
-    # maps a model -> a dict of task -> values
-    predictions: dict[str, dict[str, list[T.Tensor] | T.Tensor]] = {}
-
-    for k, v in experiment_reader.data.items():
-        if not k.endswith("predictions"):
-            continue
-
-        model, metric, _ = k.rsplit("_", 2)
-
-        if model not in predictions:
-            predictions[model] = {}
-
-        predictions[model][metric] = v
-
     assert "base" in predictions
 
     # get function specific data like num tasks, num points, and graph range
@@ -125,21 +97,27 @@ def plot_1d_prediction_graph(experiment_reader: ExperimentReader) -> None:
     plot.update_yaxes(showticklabels=False, range=graph_range)
     plot.update_layout({"title": {"text": "Predictions"}})
 
+    # x axes are shared between traces so only create them once
+    # per task axes are keyed on (task index, length)
+    x_full = T.linspace(0, num_tasks, num_points).tolist()
+    x_tasks: dict[tuple[int, int], list[float]] = {}
+
     for metric, values in predictions["base"].items():
         # plot all non task specific baselines on all subplots
         if isinstance(values, T.Tensor):
+            # convert the baseline once and share it between every subplot
+            base_trace = {
+                "x": x_full,
+                "y": values.squeeze().numpy(),
+                "opacity": 0.1,
+                "line": {"color": "lightblue"},
+                "name": "Base Function",
+                "legendgroup": "base_background",
+            }
             for row_idx in range(len(predictions)):
                 for col_idx in range(num_tasks):
                     plot.add_trace(
-                        go.Scatter(
-                            x=T.linspace(0, num_tasks, len(values)),
-                            y=values.squeeze(),
-                            opacity=0.1,
-                            line={"color": "lightblue"},
-                            name="Base Function",
-                            legendgroup="base_background",
-                            showlegend=row_idx + col_idx == 0,
-                        ),
+                        go.Scatter(**base_trace, showlegend=row_idx + col_idx == 0),
                         row_idx + 1,
                         col_idx + 1,
                     )
@@ -154,15 +132,18 @@ def plot_1d_prediction_graph(experiment_reader: ExperimentReader) -> None:
                     # then plot it over the entire graph
                     # otherwise its a graph of a task and shold be plotted on a subset of the graph
                     if len(values[col_idx]) == num_points:
-                        x = T.linspace(0, num_tasks, num_points)
+                        x = x_full
                     else:
-                        x = T.linspace(col_idx, col_idx + 1, len(values[col_idx]))
+                        key = (col_idx, len(values[col_idx]))
+                        if key not in x_tasks:
+                            x_tasks[key] = T.linspace(col_idx, col_idx + 1, key[1]).tolist()
+                        x = x_tasks[key]
 
-                    y = values[col_idx]
+                    y = values[col_idx].squeeze().numpy()
                     plot.add_trace(
                         go.Scatter(
-                            x=x.squeeze(),
-                            y=y.squeeze(),
+                            x=x,
+                            y=y,
                             line={"color": color},
                             name=f"{model.capitalize()} {metric.capitalize()}",
                             legendgroup=model,
@@ -175,25 +156,14 @@ def plot_1d_prediction_graph(experiment_reader: ExperimentReader) -> None:
     st.plotly_chart(plot)
 
 
-def plot_2d_prediction_graph(experiment_reader: ExperimentReader) -> None:
+def plot_2d_prediction_graph(
+    predictions: dict[str, dict[str, list[T.Tensor] | T.Tensor]]
+) -> None:
     """
     Creates prediction graphs for 2d functions, i.e., surfaces
+    from a dict of model -> a dict of task -> values
     """
 
-    # maps a model -> a dict of task -> values
-    predictions: dict[str, dict[str, list[T.Tensor] | T.Tensor]] = {}
-
-    for k, v in experiment_reader.data.items():
-        if not k.endswith("predictions"):
-            continue
-
-        model, metric, _ = k.rsplit("_", 2)
-
-        if model not in predictions:
-            predictions[model] = {}
-
-        predictions[model][metric] = v
-
     assert "base" in predictions
 
     # get function specific data like num tasks, num points, and graph range
@@ -249,9 +219,10 @@ def plot_2d_prediction_graph(experiment_reader: ExperimentReader) -> None:
                         go.Surface(
                             z=values.reshape([round(math.sqrt(num_points))] * 4)
                             .permute(0, 2, 1, 3)
-                            .reshape(num_points, num_points),
-                            name=f"{model.capitalize()} {metric.capitalize()}",
-                            legendgroup=model,
+                            .reshape(num_points, num_points)
+                            .numpy(),
+                            name=f"Base {metric.capitalize()}",
+                            legendgroup="base",
                             showlegend=row_idx + col_idx == 0,
                             opacity=0.1,
                             showscale=False,
@@ -262,7 +233,7 @@ def plot_2d_prediction_graph(experiment_reader: ExperimentReader) -> None:
                     )
 
     # don't draw other baseline stuff for 2d
-    del predictions["base"]
+    predictions = {k: v for k, v in predictions.items() if k != "base"}
 
     for row_idx, (model, task_data) in enumerate(predictions.items()):
         for col_idx in range(num_tasks):
@@ -273,7 +244,8 @@ def plot_2d_prediction_graph(experiment_reader: ExperimentReader) -> None:
                             z=values[col_idx]
                             .reshape([round(math.sqrt(num_points))] * 4)
                             .permute(0, 2, 1, 3)
-                            .reshape(num_points, num_points),
+                            .reshape(num_points, num_points)
+                            .numpy(),
                             name=f"{model.capitalize()} {metric.capitalize()}",
                             legendgroup=model,
                             showlegend=col_idx == 0,
@@ -287,7 +259,10 @@ def plot_2d_prediction_graph(experiment_reader: ExperimentReader) -> None:
     st.plotly_chart(plot)
 
 
-def plot_prediction_graph(experiment_reader: ExperimentReader) -> None:
+def plot_prediction_graph(
+    experiment_reader: ExperimentReader,
+    predictions: dict[str, dict[str, list[T.Tensor] | T.Tensor]],
+) -> None:
     """
     Calls either `plot_1d_prediction_graphs` or `plot_2d_prediction_graphs`
     depending on `experiment_reader.experiment_dtype`
@@ -295,9 +270,9 @@ def plot_prediction_graph(experiment_reader: ExperimentReader) -> None:
 
     match experiment_reader.experiment_dtype:
         case ExperimentDataType.function_1d:
-            plot_1d_prediction_graph(experiment_reader)
+            plot_1d_prediction_graph(predictions)
         case ExperimentDataType.function_2d:
-            plot_2d_prediction_graph(experiment_reader)
+            plot_2d_prediction_graph(predictions)
 
 
 def write_data(experiment_reader: ExperimentReader) -> None:
@@ -338,9 +313,47 @@ def fetch_experiment_reader(experiment: str) -> ExperimentReader:
     return reader
 
 
+def index_experiment_data(
+    experiment_reader: ExperimentReader,
+) -> tuple[
+    dict[str, dict[str, T.Tensor]], dict[str, dict[str, list[T.Tensor] | T.Tensor]]
+]:
+    """
+    Groups the data of an experiment into losses and predictions in a single pass
+
+    Returns a dict mapping metric -> a dict of model -> loss values
+    and a dict mapping model -> a dict of task -> prediction values
+    """
+
+    losses: dict[str, dict[str, T.Tensor]] = {}
+    predictions: dict[str, dict[str, list[T.Tensor] | T.Tensor]] = {}
+
+    for k, v in experiment_reader.data.items():
+        if k.endswith("loss"):
+            # grab the model and metric from the result key
+            model, metric, _ = k.rsplit("_", 2)
+
+            if metric not in losses:
+                losses[metric] = {}
+
+            assert isinstance(v, T.Tensor)
+            losses[metric][model] = v
+        elif k.endswith("predictions"):
+            model, metric, _ = k.rsplit("_", 2)
+
+            if model not in predictions:
+                predictions[model] = {}
+
+            assert not isinstance(v, dict)
+            predictions[model][metric] = v
+
+    return losses, predictions
+
+
 def page_function(experiment: str) -> Callable:
     def _page_function() -> None:
         experiment_reader = fetch_experiment_reader(experiment)
+        losses, predictions = index_experiment_data(experiment_reader)
 
         st.write(f"# {experiment}")
         st.write("##")
@@ -348,8 +361,8 @@ def page_function(experiment: str) -> Callable:
         st.write("## Graphs")
         st.write("")
         st.write("")
-        plot_loss_graphs(experiment_reader)
-        plot_prediction_graph(experiment_reader)
+        plot_loss_graphs(losses)
+        plot_prediction_graph(experiment_reader, predictions)
 
         st.write("## Data")
         st.write("")
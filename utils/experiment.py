@@ -8,7 +8,12 @@ from torch.utils.data import Dataset
 from utils import kan_reg_term
 from utils.data_management import ExperimentDataType, ExperimentWriter
 from utils.models import MLP
-from utils.training import TrainModelArguments, train_model
+from utils.training import (
+    TrainModelArguments,
+    compile_model,
+    reduced_precision_matmul,
+    train_model,
+)
 
 
 def run_experiment(
@@ -95,6 +100,14 @@ def run_experiment(
         mlp = MLP(architecture, **mlp_kwargs).to(device)
         models[f"mlp_{param_count}"] = mlp
 
+    # compile each model once to fuse small kernels and reduce launch overhead,
+    # any prediction dataset serves as a sample input since it matches the model input
+    sample_input = next(iter(pred_datasets.values()))
+    if isinstance(sample_input, list):
+        sample_input = sample_input[0]
+    with reduced_precision_matmul(bool(training_args.allow_tf32)):
+        compiled_models = {n: compile_model(m, sample_input) for n, m in models.items()}
+
     # all metric evaluations and predictions
     # each metric is of the form {model}_{dataset}_{{metric}|predictions}
     results: dict[str, Any] = {}
@@ -120,10 +133,11 @@ def run_experiment(
                 loss_fn = base_loss_fn
 
             training_results = train_model(
-                model,
+                compiled_models[model_name],
                 datasets,
                 pbar_description=f"{model_name.upper()} Task ({task_idx + 1}/{len(task_datasets)})",
                 loss_fn=loss_fn,
+                device=device,
                 **training_args.to_dict(),
             )
 
@@ -1,10 +1,13 @@
+import warnings
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Callable, Type
+from typing import Any, Callable, Generator, Type
 
 import torch as T
+from kan import KAN
 from torch import nn, optim
 from torch.nn import functional as F
-from torch.utils.data import DataLoader, Dataset
+from torch.utils.data import DataLoader, Dataset, TensorDataset
 from tqdm import tqdm
 from typing_extensions import Self
 
@@ -58,6 +61,107 @@ def RMSE_loss(input: T.Tensor, target: T.Tensor, **mse_kwargs: Any) -> T.Tensor:
     return T.sqrt(F.mse_loss(input, target, **mse_kwargs))
 
 
+def create_batches(
+    dataset: Dataset, batch_size: int
+) -> list[tuple[T.Tensor, ...]] | DataLoader:
+    """
+    Splits a dataset into batches, slicing the tensors of a `TensorDataset`
+    directly and falling back to a `DataLoader` for any other dataset
+
+    Parameters
+    ----------
+    dataset : Dataset
+        Dataset to batch
+
+    batch_size : int
+        Number of samples in each batch
+
+    Returns
+    -------
+    list[tuple[T.Tensor, ...]] | DataLoader
+        Reusable iterable of batches in dataset order
+    """
+
+    # slices of already loaded tensors are views, so no collating or copying is needed
+    if isinstance(dataset, TensorDataset):
+        num_samples = len(dataset)
+        return [
+            tuple(t[i : i + batch_size] for t in dataset.tensors)
+            for i in range(0, num_samples, batch_size)
+        ]
+
+    return DataLoader(dataset, batch_size)
+
+
+@contextmanager
+def reduced_precision_matmul(enabled: bool) -> Generator[None, None, None]:
+    """
+    Allows tf32 tensor cores for float32 matmuls while inside the context,
+    restoring the previous flag on exit
+
+    Parameters
+    ----------
+    enabled : bool
+        Whether to allow tf32, if False the flag is left untouched
+    """
+
+    if not enabled:
+        yield
+        return
+
+    previous_allow_tf32 = T.backends.cuda.matmul.allow_tf32
+    T.backends.cuda.matmul.allow_tf32 = True
+
+    try:
+        yield
+    finally:
+        T.backends.cuda.matmul.allow_tf32 = previous_allow_tf32
+
+
+def compile_model(model: nn.Module, sample_input: T.Tensor) -> nn.Module:
+    """
+    Compiles a model with `T.compile` when cuda is available, falling back to eager mode
+    on failure, compilation is triggered up front by running a training forward / backward
+    and an inference forward on sample_input so both graphs used by `train_model` are built
+
+    Parameters
+    ----------
+    model : nn.Module
+        Pytorch model to compile
+
+    sample_input : T.Tensor
+        Input used to trigger compilation
+
+    Returns
+    -------
+    nn.Module
+        Compiled model or model itself if compilation is unsupported
+    """
+
+    if not T.cuda.is_available():
+        return model
+
+    # kan forwards store activations read by the regularization term,
+    # which cuda graph replays of reduce-overhead would overwrite
+    mode = "default" if isinstance(model, KAN) else "reduce-overhead"
+
+    try:
+        # dynamic shapes avoid recompiling for partial batches and eval sets
+        compiled_model = T.compile(model, mode=mode, dynamic=True)
+
+        compiled_model(sample_input).sum().backward()
+        with T.inference_mode():
+            compiled_model(sample_input)
+    except RuntimeError as e:
+        warnings.warn(f"T.compile failed, falling back to eager mode: {e}")
+        compiled_model = model
+    finally:
+        # discard gradients accumulated by the compilation pass
+        model.zero_grad(set_to_none=True)
+
+    return compiled_model
+
+
 @dataclass
 class TrainModelArguments:
     model: nn.Module | None = None
@@ -71,6 +175,7 @@ class TrainModelArguments:
     eval_batch_size: int | None = None
     logging_freq: int | None = None
     pbar_description: str | None = None
+    allow_tf32: bool | None = None
 
     def to_dict(self: Self) -> dict[str, Any]:
         return {k: v for k, v in self.__dict__.items() if v is not None}
@@ -85,9 +190,11 @@ def train_model(
     lr: float = 1e-2,
     batch_size: int = 8,
     eval_fns: dict[str, Callable[[T.Tensor, T.Tensor], T.Tensor]] = {"loss": RMSE_loss},
-    eval_batch_size: int = 32,
+    eval_batch_size: int = 4096,
     logging_freq: int = 100,
     pbar_description: str = "",
+    allow_tf32: bool = False,
+    device: T.device | None = None,
 ) -> dict[str, list[float]]:
     """
     Trains a model according to parameters and datasets
@@ -120,7 +227,7 @@ def train_model(
         Functions to evaluate datasets on, by default {"loss": MSE_loss}
 
     eval_batch_size : int, optional
-        Batch size for evaluation dataloaders, by default 32
+        Batch size for evaluation dataloaders, by default 4096
 
     logging_freq : int, optional
         Frequency to save train loss and evaluation losses, by default 100
@@ -128,78 +235,107 @@ def train_model(
     pbar_description : str, optional
         Description to use on progress bar, by default ""
 
+    allow_tf32 : bool, optional
+        Allow tf32 float32 matmuls while training,
+        faster on ampere+ gpus but lowers precision of losses, by default False
+
+    device : T.device | None, optional
+        Device training metrics are accumulated on, defaults to device of model parameters
+
     Returns
     -------
     dict[str, list[float]]
         Loss metrics for each dataset in datasets
     """
 
+    # use passed device or the device the model lives on
+    device = device or next(model.parameters()).device
+
     model_optimizer = optimizer(model.parameters(), lr=lr)  # type: ignore
 
     # initialize train / eval dataloaders and results dict
     train_dataset = datasets["train"]
-    train_dataloader = DataLoader(train_dataset, batch_size)
+    train_dataloader = create_batches(train_dataset, batch_size)
     eval_dataloaders = {
-        n: DataLoader(d, eval_batch_size) for n, d in datasets.items() if n != "train"
+        n: create_batches(d, eval_batch_size)
+        for n, d in datasets.items()
+        if n != "train"
     }
     results: dict[str, list[float]] = {
         f"{d}_{e}": [] for d in datasets.keys() for e in eval_fns
     }
 
-    train_metrics = {k: 0.0 for k in eval_fns}
+    # rmse metric can be derived from the training loss when it is a plain mse loss
+    reuse_mse = isinstance(loss_fn, nn.MSELoss) and loss_fn.reduction == "mean"
+
+    # training metrics are kept on device and only synced when logged
+    train_metrics = {k: T.zeros((), device=device) for k in eval_fns}
+
+    # rolling average weights for the old and new value indexed by min(iteration, logging_freq)
+    # first two iterations both overwrite the rolling value
+    coef_old = [0.0] + [(n - 1) / n for n in range(1, logging_freq + 1)]
+    coef_new = [1.0] + [1 / n for n in range(1, logging_freq + 1)]
     iteration = 0
 
     pbar: tqdm = tqdm(total=num_epochs * len(train_dataloader))
     pbar.set_description(f"{pbar_description}: {' | '.join(f'{k}: #####' for k in results)}")  # type: ignore
 
-    for _ in range(num_epochs):
-        for X_batch, Y_batch in train_dataloader:
-            Y_pred = model(X_batch)
+    with reduced_precision_matmul(allow_tf32):
+        for _ in range(num_epochs):
+            for X_batch, Y_batch in train_dataloader:
+                Y_pred = model(X_batch)
 
-            loss = loss_fn(Y_pred, Y_batch)
-            loss.backward()
+                loss = loss_fn(Y_pred, Y_batch)
+                loss.backward()
 
-            model_optimizer.step()
-            model_optimizer.zero_grad()
+                model_optimizer.step()
+                model_optimizer.zero_grad(set_to_none=True)
 
-            with T.no_grad():
-                # training metrics are evaluated as rolling
-                for metric, eval_fn in eval_fns.items():
-                    metric_val = eval_fn(Y_pred, Y_batch).item()
+                coef_idx = iteration if iteration < logging_freq else logging_freq
 
-                    if iteration == 0:
-                        train_metrics[metric] = metric_val
-                    else:
-                        n = min(iteration, logging_freq)
-                        train_metrics[metric] = (
-                            train_metrics[metric] * (n - 1) + metric_val
-                        ) / n
-
-            iteration += 1
-
-            pbar.update()
-
-            if iteration % logging_freq == 0:
-                for metric, metric_value in train_metrics.items():
-                    results[f"train_{metric}"].append(metric_value)
-
-                # calculate average loss of each eval_dataloader
                 with T.no_grad():
-                    for name, dataloader in eval_dataloaders.items():
-                        for metric, eval_fn in eval_fns.items():
-                            metric_values = []
+                    # training metrics are evaluated as rolling
+                    for metric, eval_fn in eval_fns.items():
+                        if reuse_mse and eval_fn is RMSE_loss:
+                            metric_val = T.sqrt(loss.detach())
+                        else:
+                            metric_val = eval_fn(Y_pred, Y_batch)
+
+                        train_metrics[metric].mul_(coef_old[coef_idx]).add_(
+                            metric_val, alpha=coef_new[coef_idx]
+                        )
+
+                iteration += 1
+
+                pbar.update()
+
+                if iteration % logging_freq == 0:
+                    for metric, metric_value in train_metrics.items():
+                        results[f"train_{metric}"].append(metric_value.item())
+
+                    # calculate average loss of each eval_dataloader weighted by batch size
+                    # running a single forward per batch shared by all metrics
+                    with T.inference_mode():
+                        for name, dataloader in eval_dataloaders.items():
+                            metric_values: dict[str, list[T.Tensor]] = {
+                                m: [] for m in eval_fns
+                            }
+                            batch_sizes = []
                             for X_batch, Y_batch in dataloader:
                                 Y_pred = model(X_batch)
-                                metric_val = eval_fn(Y_pred, Y_batch).item()
-                                metric_values.append(metric_val)
-
-                            results[f"{name}_{metric}"].append(
-                                sum(metric_values) / len(metric_values)
-                            )
-
-                # add losses to progress bar
-                str_losses = " | ".join(f"{k}: {v[-1]:.2f}" for k, v in results.items())
-                pbar.set_description(f"{pbar_description}: {str_losses}")  # type: ignore
+                                batch_sizes.append(len(X_batch))
+                                for metric, eval_fn in eval_fns.items():
+                                    metric_values[metric].append(eval_fn(Y_pred, Y_batch))
+
+                            weights = T.tensor(batch_sizes, device=device) / sum(batch_sizes)
+                            for metric, values in metric_values.items():
+                                results[f"{name}_{metric}"].append(
+                                    (T.stack(values) * weights).sum().item()
+                                )
+
+                    # add losses to progress bar
+                    str_losses = " | ".join(f"{k}: {v[-1]:.2f}" for k, v in results.items())
+                    pbar.set_description(f"{pbar_description}: {str_losses}")  # type: ignore
 
     pbar.close()
 
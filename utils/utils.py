@@ -138,3 +138,30 @@ def gaussian(x: T.Tensor, mean: float, std: float) -> T.Tensor:
     """
 
     return (1 / (std * sqrt(2 * pi))) * T.exp(-(1 / 2) * ((x - mean) / std) ** 2)
+
+
+def gaussian_batch(x: T.Tensor, means: T.Tensor, std: float) -> T.Tensor:
+    """
+    Evaluates a gaussian distribution for each mean in means at once,
+    reusing a single intermediate tensor for all elementwise operations
+
+    Parameters
+    ----------
+    x : T.Tensor
+        Values to evaluate gaussian distributions at
+
+    means : T.Tensor
+        1d tensor of means of each gaussian distribution
+
+    std : float
+        Standard deviation shared by every gaussian distribution
+
+    Returns
+    -------
+    T.Tensor
+        Tensor of shape (*x.shape, len(means)) with values of each gaussian distribution
+    """
+
+    d = x.unsqueeze(-1) - means
+
+    return d.mul_(1 / std).square_().mul_(-1 / 2).exp_().mul_(1 / (std * sqrt(2 * pi)))